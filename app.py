@@ -1,71 +1,109 @@
 import datetime
+import numpy as np
 import streamlit as st
-import plotly.figure_factory as ff
+import plotly.graph_objects as go
 
 # --------------------------
-# Stage colors
+# Stages in schedule order: (task, day mode, colour)
 # --------------------------
-stage_colors = {
-    "Shipment→Split Gap": "lightblue",
-    "Splitting": "orange",
-    "Split→Lab Gap": "yellow",
-    "Lab": "green"
-}
+stage_meta = (
+    ("Shipment→Split Gap", "workweek", "lightblue"),
+    ("Splitting", "workweek", "orange"),
+    ("Split→Lab Gap", "workweek", "yellow"),
+    ("Lab", "calendar", "green")
+)
 
 # --------------------------
 # Helper: subtract business days (Mon–Fri only)
 # --------------------------
-def subtract_business_days(end_date, business_days):
-    current = end_date
-    days_remaining = business_days
-    while days_remaining > 0:
-        current -= datetime.timedelta(days=1)
-        if current.weekday() < 5:  # Mon–Fri
-            days_remaining -= 1
-    return current
+def subtract_business_days(end_day, business_days):
+    if business_days <= 0:
+        return end_day
+    # Roll a weekend end date forward so the first step back lands on Friday
+    return np.busday_offset(end_day, -business_days, roll="forward")
 
 # --------------------------
-# Create gantt dataframe
+# Helper: resolve cut-off text to an ISO date
 # --------------------------
-def create_gantt_df(shipment_gap, core_depth, split_rate, split_lab_gap, lab_days, cutoff_date_str):
+# Kept outside the cached functions so the fallback follows the live "today"
+def resolve_cutoff_date(cutoff_date_str):
     try:
         cutoff_date = datetime.datetime.strptime(cutoff_date_str, "%Y-%m-%d")
     except:
         cutoff_date = datetime.datetime.today() + datetime.timedelta(days=100)
+    return cutoff_date.strftime("%Y-%m-%d")
 
+# --------------------------
+# Create gantt dataframe
+# --------------------------
+def create_gantt_df(shipment_gap, core_depth, split_rate, split_lab_gap, lab_days, cutoff_date_str):
     split_days = int(core_depth / split_rate)
 
-    stages = [
-        ("Shipment→Split Gap", shipment_gap, "workweek"),
-        ("Splitting", split_days, "workweek"),
-        ("Split→Lab Gap", split_lab_gap, "workweek"),
-        ("Lab", lab_days, "calendar")
-    ]
+    durations = (shipment_gap, split_days, split_lab_gap, lab_days)
 
-    df = []
-    end = cutoff_date
-    for task, duration, mode in reversed(stages):
+    # Walk back from the cut-off on datetime64 days, filling each stage's slot in place
+    one_day = np.timedelta64(1, "D")
+    starts = np.empty(len(stage_meta), dtype="datetime64[D]")
+    ends = np.empty(len(stage_meta), dtype="datetime64[D]")
+    end = np.datetime64(cutoff_date_str, "D")
+    for i in range(len(stage_meta) - 1, -1, -1):
+        duration, mode = durations[i], stage_meta[i][1]
         if mode == "calendar":
-            start = end - datetime.timedelta(days=duration - 1)
+            start = end - (duration - 1) * one_day
         else:  # workweek
             start = subtract_business_days(end, duration - 1)
-        df.append({
-            "Task": task,
-            "Start": start.strftime("%Y-%m-%d"),
-            "Finish": end.strftime("%Y-%m-%d"),
-            "Resource": stage_colors[task]
-        })
-        end = start - datetime.timedelta(days=1)
+        starts[i], ends[i] = start, end
+        end = start - one_day
 
-    return list(reversed(df))
+    start_strs = np.datetime_as_string(starts, unit="D").tolist()
+    end_strs = np.datetime_as_string(ends, unit="D").tolist()
+    records = [
+        {
+            "Task": task,
+            "Start": start,
+            "Finish": end,
+            "Resource": color
+        }
+        for (task, _, color), start, end in zip(stage_meta, start_strs, end_strs)
+    ]
+    return records, starts, ends
 
 # --------------------------
 # Gantt chart function
 # --------------------------
+# cache_resource hands back the same Figure instead of unpickling a copy, which
+# costs more than rebuilding it; callers must not mutate the returned figure.
+# It also covers create_gantt_df, which is only called from here.
+@st.cache_resource(show_spinner=False, max_entries=100)
 def update_gantt(cutoff_date, core_depth, shipment_gap, splitting_rate, split_to_lab_gap, lab_days):
-    df = create_gantt_df(shipment_gap, core_depth, splitting_rate, split_to_lab_gap, lab_days, cutoff_date)
-    fig = ff.create_gantt(df, index_col='Resource', show_colorbar=False, showgrid_x=True, showgrid_y=True)
-    fig.update_layout(title="Gantt Chart", height=350)
+    df, starts, finishes = create_gantt_df(shipment_gap, core_depth, splitting_rate, split_to_lab_gap, lab_days, cutoff_date)
+    # Date-axis bars take their length in milliseconds, measured from base
+    spans_ms = (finishes - starts).astype("timedelta64[ms]").astype(np.int64)
+    fig = go.Figure(go.Bar(
+        base=[row["Start"] for row in df],
+        x=spans_ms,
+        y=[row["Task"] for row in df],
+        orientation="h",
+        width=0.4,
+        marker_color=[row["Resource"] for row in df],
+        customdata=[row["Finish"] for row in df],
+        hovertemplate="%{y}: %{base|%Y-%m-%d} to %{customdata}<extra></extra>"
+    ))
+    fig.update_xaxes(
+        type="date",
+        showgrid=True,
+        zeroline=False,
+        rangeselector=dict(buttons=[
+            dict(count=7, label="1w", step="day", stepmode="backward"),
+            dict(count=1, label="1m", step="month", stepmode="backward"),
+            dict(count=6, label="6m", step="month", stepmode="backward"),
+            dict(count=1, label="YTD", step="year", stepmode="todate"),
+            dict(count=1, label="1y", step="year", stepmode="backward"),
+            dict(step="all")
+        ])
+    )
+    fig.update_yaxes(showgrid=True, zeroline=False)
+    fig.update_layout(title="Gantt Chart", height=350, hovermode="closest", showlegend=False)
     return fig, df[0]["Start"]
 
 # --------------------------
@@ -105,7 +143,7 @@ with col4:
     lab_days = st.slider("Lab Processing Time (days)", 10, 100, 50, step=5)
 
 # Update chart
-fig, start_date = update_gantt(cutoff_date, core_depth, shipment_gap, splitting_rate, split_to_lab_gap, lab_days)
+fig, start_date = update_gantt(resolve_cutoff_date(cutoff_date), core_depth, shipment_gap, splitting_rate, split_to_lab_gap, lab_days)
 st.plotly_chart(fig, use_container_width=True)
 
 # Shipment date highlight